@@ -4,11 +4,18 @@ import cv2
 import tkinter as tk
 from PIL import Image, ImageTk
 import time
+from rc_control import RcController, MANUAL_AXES, MANUAL_KEYS, KEY_HOLD_TIMEOUT
+from frame_source import FrameSource
+from stream_health import StreamMonitor
+from face_tracks import FaceTracker
+from capture import FrameCapture
+from face_detectors import FACE_DETECTOR, create_detector
 
 WIDTH = 320
 HEIGHT = 240
-MOVE_DISTANCE = 20
-ROTATE_DEGREE = 15
+TRACK_YAW_SPEED = 30  # rc yaw velocity while the face is off-centre horizontally
+TRACK_UP_DOWN_SPEED = 20  # rc up/down velocity while the face is off-centre vertically
+TRACK_FORWARD_SPEED = 20  # rc forward/backward velocity while the face is too small/large
 MAX_COMMAND_RETRIES = 5
 FACE_THRESHOLD = 50
 FACE_SIZE_THRESHOLD = 5000  # Sample threshold for face area to start moving forward
@@ -21,7 +28,13 @@ class TelloApp:
         self.me = Tello()
         self.video_canvas = None
         self.photo = None
-        self.face_cascade = None
+        self.face_detector = None
+        self.face_tracker = FaceTracker()
+        self.capture = FrameCapture()
+        self.rc = RcController(self.me)
+        self.frames = None
+        self.monitor = None
+        self.last_seq = 0
         self.battery_percentage = 100
         self.low_battery = False
         self.command_lock = threading.Lock()
@@ -36,6 +49,8 @@ class TelloApp:
     def setup_ui(self):
         self.video_canvas = tk.Canvas(self.window, width=WIDTH, height=HEIGHT)
         self.video_canvas.pack(padx=10, pady=10)
+        # Frames are swapped into this item, deleting items under a held button loses its release
+        self.image_id = self.video_canvas.create_image(0, 0, anchor=tk.NW)
         self.draw_buttons()
 
     def bind_buttons(self):
@@ -43,22 +58,33 @@ class TelloApp:
             "start_btn": self.start_drone,
             "land_btn": self.land_drone,
             "exit_btn": self.exit_app,
-            "left_btn": self.go_left,
-            "right_btn": self.go_right,
-            "up_btn": self.go_up,
-            "down_btn": self.go_down,
-            "yaw_left_btn": self.yaw_left,
-            "yaw_right_btn": self.yaw_right,
-            "tilt_forward_btn": self.tilt_forward,
-            "tilt_backward_btn": self.tilt_backward
+            "snapshot_btn": self.take_snapshot,
+            "burst_btn": self.start_burst
         }
         for tag, func in buttons_bindings.items():
             self.video_canvas.tag_bind(tag, "<Button-1>", func)
 
+        # Movement buttons and keys stream velocities for as long as they are held
+        for tag in MANUAL_AXES:
+            self.video_canvas.tag_bind(tag, "<ButtonPress-1>", lambda event, tag=tag: self.manual_press(tag))
+            self.video_canvas.tag_bind(tag, "<ButtonRelease-1>", lambda event, tag=tag: self.manual_release(tag))
+        for key, tag in MANUAL_KEYS.items():
+            self.window.bind(f"<KeyPress-{key}>", lambda event, tag=tag: self.manual_press(tag, KEY_HOLD_TIMEOUT))
+            self.window.bind(f"<KeyRelease-{key}>", lambda event, tag=tag: self.manual_release(tag))
+        self.window.bind("<FocusOut>", lambda event: self.rc.release_all())  # Releases then go to another window
+        self.window.bind("<KeyPress-n>", lambda event: self.face_tracker.select_next())  # Lock onto the next face
+        self.window.bind("<KeyPress-p>", self.take_snapshot)
+        self.window.bind("<KeyPress-b>", self.start_burst)
+
     def initialize_resources(self):
-        self.face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+        self.face_detector = create_detector(FACE_DETECTOR, scale_factor=1.1, min_neighbors=5, min_size=(30, 30))
         self.me.connect()
         self.me.streamon()
+        self.rc.start()
+        self.frames = FrameSource(self.me.get_frame_read())
+        self.frames.start()
+        self.monitor = StreamMonitor(self.me, self.frames, self.rc)
+        self.monitor.start()
 
     def threaded_drone_command(self, func):
         def execute_command():
@@ -79,45 +105,35 @@ class TelloApp:
         self.threaded_drone_command(self.me.takeoff)
 
     def land_drone(self, event=None):
+        self.rc.release_all()
+        self.rc.set_auto(0, 0, 0, 0)  # update_video stops once landing, don't keep a tracking velocity
         self.threaded_drone_command(self.me.land)
         self.low_battery = True
 
     def exit_app(self, event=None):
+        self.rc.stop()
+        self.monitor.stop()
+        self.frames.stop()
+        self.capture.close()  # Finish pending writes
+        print(self.monitor.report())
         self.threaded_drone_command(self.me.streamoff)
         self.me.land()  # Ensure the drone lands before exiting
         self.window.destroy()  # Close the window
 
-    def go_left(self, event=None):
-        if not self.low_battery:
-            self.threaded_drone_command(lambda: self.me.move_left(MOVE_DISTANCE))
-
-    def go_right(self, event=None):
-        if not self.low_battery:
-            self.threaded_drone_command(lambda: self.me.move_right(MOVE_DISTANCE))
-
-    def go_up(self, event=None):
-        if not self.low_battery:
-            self.threaded_drone_command(lambda: self.me.move_up(MOVE_DISTANCE))
-
-    def go_down(self, event=None):
-        if not self.low_battery:
-            self.threaded_drone_command(lambda: self.me.move_down(MOVE_DISTANCE))
+    def take_snapshot(self, event=None):
+        frame = self.frames.poll()
+        if frame is not None:
+            self.capture.snapshot(frame.image, frame.seq)  # Full resolution, written in the background
 
-    def yaw_left(self, event=None):
-        if not self.low_battery:
-            self.threaded_drone_command(lambda: self.me.rotate_counter_clockwise(ROTATE_DEGREE))
+    def start_burst(self, event=None):
+        self.capture.start_burst()
 
-    def yaw_right(self, event=None):
+    def manual_press(self, tag, timeout=None):
         if not self.low_battery:
-            self.threaded_drone_command(lambda: self.me.rotate_clockwise(ROTATE_DEGREE))
+            self.rc.press(tag, timeout=timeout)
 
-    def tilt_forward(self, event=None):
-        if not self.low_battery:
-            self.threaded_drone_command(lambda: self.me.move_forward(MOVE_DISTANCE))
-
-    def tilt_backward(self, event=None):
-        if not self.low_battery:
-            self.threaded_drone_command(lambda: self.me.move_backward(MOVE_DISTANCE))
+    def manual_release(self, tag):
+        self.rc.release(tag)
 
     def update_battery(self):
         self.battery_percentage = int(self.me.get_battery())
@@ -143,28 +159,37 @@ class TelloApp:
             (250, 10, 300, 40, "purple", "yaw_right_btn", "YawR"),
             (220, 40, 270, 70, "purple", "tilt_forward_btn", "TiltF"),
             (220, 80, 270, 110, "purple", "tilt_backward_btn", "TiltB"),
+            (160, 45, 210, 70, "orange", "snapshot_btn", "Snap"),
+            (160, 80, 210, 110, "orange", "burst_btn", "Burst"),
         ]
 
         for x1, y1, x2, y2, color, tag, text in movement_buttons:
             self.video_canvas.create_rectangle(x1, y1, x2, y2, fill=color, tags=tag)
-            self.video_canvas.create_text((x1+x2)//2, (y1+y2)//2, text=text)
+            self.video_canvas.create_text((x1+x2)//2, (y1+y2)//2, text=text, tags=tag)  # Label is part of the button
     def update_video(self):
         if self.low_battery:
             return
 
-        frame_read = self.me.get_frame_read()
-        if frame_read is not None and frame_read.frame is not None:
-            my_frame = frame_read.frame
-            img = cv2.resize(my_frame, (WIDTH, HEIGHT))
-            gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        # Only handle frames we have not seen yet
+        frame = self.frames.poll(self.last_seq)
+        if frame is not None:
+            self.last_seq = frame.seq
+            self.capture.offer(frame.image, frame.seq)  # Saves the frame if a burst is running
+            img = cv2.resize(frame.image, (WIDTH, HEIGHT))
 
             error_x = 0
             error_y = 0
 
-            faces = self.face_cascade.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=5, minSize=(30, 30))
+            faces = self.face_detector.detect(img)
+            self.face_tracker.update(faces)
+            target = self.face_tracker.target()
+
+            # Tracking velocities go through the rc sender, zero unless a face says otherwise
+            left_right, for_back, up_down, yaw = 0, 0, 0, 0
 
-            if len(faces) > 0:
-                (x, y, w, h) = faces[0]
+            # Don't steer on a frame that sat in the decoder too long
+            if target is not None and not frame.is_stale():
+                (x, y, w, h) = target.box.astype(int)
                 cv2.rectangle(img, (x, y), (x + w, y + h), (255, 0, 0), 2)
 
                 center_x = x + w // 2
@@ -175,31 +200,30 @@ class TelloApp:
 
                 # Yaw control
                 if abs(error_x) > FACE_THRESHOLD:
-                    if error_x > 0:
-                        self.threaded_drone_command(lambda: self.me.rotate_clockwise(ROTATE_DEGREE))
-                    else:
-                        self.threaded_drone_command(lambda: self.me.rotate_counter_clockwise(ROTATE_DEGREE))
+                    yaw = TRACK_YAW_SPEED if error_x > 0 else -TRACK_YAW_SPEED
 
                 # Altitude control
                 if abs(error_y) > FACE_THRESHOLD:
-                    if error_y > 0:
-                        self.threaded_drone_command(lambda: self.me.move_down(MOVE_DISTANCE))
-                    else:
-                        self.threaded_drone_command(lambda: self.me.move_up(MOVE_DISTANCE))
+                    up_down = -TRACK_UP_DOWN_SPEED if error_y > 0 else TRACK_UP_DOWN_SPEED
 
                 # Forward/Backward control
                 if w * h < FACE_SIZE_THRESHOLD:
-                    self.threaded_drone_command(lambda: self.me.move_forward(MOVE_DISTANCE))
+                    for_back = TRACK_FORWARD_SPEED
                 elif w * h > FACE_SIZE_UPPER_THRESHOLD:
-                    self.threaded_drone_command(lambda: self.me.move_backward(MOVE_DISTANCE))
+                    for_back = -TRACK_FORWARD_SPEED
+
+            self.rc.set_auto(left_right, for_back, up_down, yaw)
 
             img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
             image = Image.fromarray(img)
             self.photo = ImageTk.PhotoImage(image=image)
 
-            self.video_canvas.delete("all")
-            self.video_canvas.create_image(0, 0, anchor=tk.NW, image=self.photo)
-            self.draw_buttons()
+            self.video_canvas.itemconfig(self.image_id, image=self.photo)
+            self.video_canvas.delete("stream_status")
+        elif self.monitor.is_down():
+            # Don't leave the last frame up as if it were live
+            self.video_canvas.delete("stream_status")
+            self.video_canvas.create_text(WIDTH // 2, HEIGHT - 15, text="Video lost, reconnecting...", fill="red", tags="stream_status")
 
         self.window.after(50, self.update_video)
             
@@ -5,10 +5,14 @@ import threading  # For multi-threading support
 import tkinter as tk  # For creating a graphical user interface
 from PIL import Image, ImageTk  # For handling images
 from djitellopy import Tello  # For controlling the Tello drone
+from rc_control import RcController, MANUAL_AXES, MANUAL_KEYS, KEY_HOLD_TIMEOUT  # For streaming rc velocities
+from frame_source import FrameSource  # For sequence-numbered video frames
+from stream_health import StreamMonitor  # For stall detection and video reconnect
+from face_tracks import FaceTracker  # For stable face IDs across frames
+from capture import FrameCapture  # For background snapshot and burst writes
+from face_detectors import FACE_DETECTOR, create_detector  # For pluggable face detector backends
 
 # Constants for various settings
-MOVE_DISTANCE = 20  # Distance for drone movement
-ROTATE_DEGREE = 15  # Degree for drone rotation
 MAX_COMMAND_RETRIES = 5  # Maximum number of retries for sending drone commands
 FACE_SIZE_THRESHOLD = 5000  # Threshold for face size detection
 FACE_SIZE_UPPER_THRESHOLD = 15000  # Upper threshold for face size detection
@@ -27,12 +31,16 @@ pid = [0.35, 0.35, 0]
 # Initialize the Tello drone
 tello = init_tello()
 
+# Single fixed-rate rc sender shared by face tracking and manual flight
+rc = RcController(tello)
+
 # Set the width and height for video display
 w, h = 360, 240
 
 # Global variables for tracking and error handling
 pError = 0
 pError_y = 0
+target_id = None  # Face track the error terms belong to
 tracking_enabled = False  # Flag to enable/disable face tracking
 
 # Function to capture a frame from the Tello's video stream
@@ -40,37 +48,37 @@ def get_frame():
     tello_frame = tello.get_frame_read().frame
     return cv2.resize(tello_frame, (w, h))
 
+# Associates faces across frames so tracking stays locked on one person
+face_tracker = FaceTracker()
+
+# Face detector, loaded once (set FACE_DETECTOR=lbp or dnn to fly another backend)
+face_detector = create_detector(FACE_DETECTOR, scale_factor=1.2, min_neighbors=8)
+
 # Function to detect frontal faces in an image
 def face_detect(img):
-    # Load the pre-trained face detection model
-    frontal_face = cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_frontalface_default.xml")
-    img_gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-    img_faces = frontal_face.detectMultiScale(img_gray, 1.2, 8)
+    img_faces = face_detector.detect(img)
 
-    face_list = []
-    face_list_area = []
+    # Match the detections to the existing face tracks
+    tracks = face_tracker.update(img_faces)
 
-    # Loop through the detected faces and draw rectangles around them
-    for (x, y, w, h) in img_faces:
-        cv2.rectangle(img, (x, y), (x + w, y + h), (0, 255, 0), 2)
+    # Draw every tracked face with its ID, the selected one in red
+    for track in tracks:
+        x, y, w, h = track.box.astype(int)
+        color = (0, 0, 255) if track.id == face_tracker.selected_id else (0, 255, 0)
+        cv2.rectangle(img, (x, y), (x + w, y + h), color, 2)
+        cv2.putText(img, str(track.id), (x, y - 5), cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 1, cv2.LINE_AA)
 
-        # Calculate the center coordinates of the detected face
-        cx = x + w // 2
-        cy = y + h // 2
-
-        face_list.append([cx, cy])
-        face_list_area.append(w * h)
-
-    # If faces are detected, return the image with the largest detected face
-    if len(face_list_area) != 0:
-        i = face_list_area.index(max(face_list_area))
-        return img, [face_list[i], face_list_area[i]]
-    else:
-        return img, [[0, 0], 0]
+    # Return the image with the selected face, [[0, 0], 0] if there is none
+    return img, face_tracker.target_face_info()
 
 # Function to track a face using PID control
 def face_track(face_info):
-    global pError, pError_y, tracking_enabled
+    global pError, pError_y, tracking_enabled, target_id
+
+    # The lock moved to another face, don't take a derivative across two faces
+    if face_tracker.selected_id != target_id:
+        target_id = face_tracker.selected_id
+        pError, pError_y = 0, 0
 
     if tracking_enabled and face_info[1] > 0:  # Check if tracking is enabled and a face is detected
         x = face_info[0][0]
@@ -111,12 +119,12 @@ def face_track(face_info):
         elif area < FACE_SIZE_THRESHOLD and area > 100:
             forw_backw = 20  # Increase forward speed
 
-        # Send control commands to the drone
-        tello.send_rc_control(0, forw_backw, speed_y, speed)
+        # Hand the control command to the rc sender thread
+        rc.set_auto(0, forw_backw, speed_y, speed)
         pError, pError_y = error, error_y
     else:
         # No face detected or tracking is disabled, stop the drone
-        tello.send_rc_control(0, 0, 0, 0)
+        rc.set_auto(0, 0, 0, 0)
 
 # Function to toggle the tracking system on/off
 def toggle_tracking():
@@ -131,7 +139,10 @@ class TelloApp:
         self.me = Tello()
         self.video_canvas = None
         self.photo = None
-        self.face_cascade = None
+        self.frames = None
+        self.monitor = None
+        self.capture = FrameCapture()
+        self.last_seq = 0  # Sequence number of the last processed frame
         self.command_lock = threading.Lock()
         self.setup_ui()
         self.bind_buttons()
@@ -145,6 +156,8 @@ class TelloApp:
         self.video_canvas = tk.Canvas(self.window, width=w, height=h)
         self.video_canvas.pack()
 
+        # Video frames are swapped into this item, so the buttons drawn above it are never deleted
+        self.image_id = self.video_canvas.create_image(0, 0, anchor=tk.NW)
         self.draw_buttons()
 
     # Function to bind button clicks to drone control functions
@@ -153,25 +166,41 @@ class TelloApp:
             "start_btn": self.start_drone,
             "land_btn": self.land_drone,
             "exit_btn": self.exit_app,
-            "left_btn": self.go_left,
-            "right_btn": self.go_right,
-            "up_btn": self.go_up,
-            "down_btn": self.go_down,
-            "yaw_left_btn": self.yaw_left,
-            "yaw_right_btn": self.yaw_right,
-            "tilt_forward_btn": self.tilt_forward,
-            "tilt_backward_btn": self.tilt_backward,
             "toggle_tracking_btn": lambda event=None: toggle_tracking(),  # Use lambda to wrap the function
+            "snapshot_btn": self.take_snapshot,
+            "burst_btn": self.start_burst,
         }
 
         for tag, func in buttons_bindings.items():
             self.video_canvas.tag_bind(tag, "<Button-1>", func)
 
+        # Movement buttons and keys stream velocities for as long as they are held
+        for tag in MANUAL_AXES:
+            self.video_canvas.tag_bind(tag, "<ButtonPress-1>", lambda event, tag=tag: rc.press(tag))
+            self.video_canvas.tag_bind(tag, "<ButtonRelease-1>", lambda event, tag=tag: rc.release(tag))
+        for key, tag in MANUAL_KEYS.items():
+            self.window.bind(f"<KeyPress-{key}>", lambda event, tag=tag: rc.press(tag, timeout=KEY_HOLD_TIMEOUT))
+            self.window.bind(f"<KeyRelease-{key}>", lambda event, tag=tag: rc.release(tag))
+
+        # Key releases go to another window once focus is lost, drop everything held
+        self.window.bind("<FocusOut>", lambda event: rc.release_all())
+
+        # 'n' moves the tracking lock to the next face
+        self.window.bind("<KeyPress-n>", lambda event: face_tracker.select_next())
+
+        # 'p' saves a snapshot, 'b' starts a burst
+        self.window.bind("<KeyPress-p>", self.take_snapshot)
+        self.window.bind("<KeyPress-b>", self.start_burst)
+
     # Function to initialize resources and connect to the Tello drone
     def initialize_resources(self):
-        self.face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
         self.me.connect()  # Connect to the drone
         self.me.streamon()  # Start receiving the video stream from the drone
+        rc.start()  # Start streaming rc velocities to the drone
+        self.frames = FrameSource(self.me.get_frame_read())
+        self.frames.start()  # Start numbering decoded frames
+        self.monitor = StreamMonitor(self.me, self.frames, rc)
+        self.monitor.start()  # Start watching for stream stalls
 
     # Function to execute drone commands in a separate thread
     def threaded_drone_command(self, func):
@@ -194,36 +223,27 @@ class TelloApp:
         self.threaded_drone_command(self.me.takeoff)  # Send the command to start the drone
 
     def land_drone(self, event=None):
+        rc.release_all()  # Drop any held manual input
         self.threaded_drone_command(self.me.land)  # Send the command to land the drone
 
     def exit_app(self, event=None):
+        rc.stop()  # Stop the rc sender thread and zero the velocities
+        self.monitor.stop()  # Stop the stream health checks
+        self.frames.stop()  # Stop watching for new frames
+        self.capture.close()  # Finish writing pending captures
+        print(self.monitor.report())  # Print stalls and recovery times for this session
         self.threaded_drone_command(self.me.streamoff)  # Stop receiving the video stream
         self.me.land()  # Land the drone
         self.window.destroy()  # Close the tkinter window
 
-    def go_left(self, event=None):
-        self.threaded_drone_command(lambda: self.me.move_left(MOVE_DISTANCE))  # Send the command to move the drone left
-
-    def go_right(self, event=None):
-        self.threaded_drone_command(lambda: self.me.move_right(MOVE_DISTANCE))  # Send the command to move the drone right
-
-    def go_up(self, event=None):
-        self.threaded_drone_command(lambda: self.me.move_up(MOVE_DISTANCE))  # Send the command to move the drone up
-
-    def go_down(self, event=None):
-        self.threaded_drone_command(lambda: self.me.move_down(MOVE_DISTANCE))  # Send the command to move the drone down
+    # Capture functions
+    def take_snapshot(self, event=None):
+        frame = self.frames.poll()  # Newest frame at full resolution
+        if frame is not None:
+            self.capture.snapshot(frame.image, frame.seq)  # Encoded and written in the background
 
-    def yaw_left(self, event=None):
-        self.threaded_drone_command(lambda: self.me.rotate_counter_clockwise(ROTATE_DEGREE))  # Send the command to rotate the drone left
-
-    def yaw_right(self, event=None):
-        self.threaded_drone_command(lambda: self.me.rotate_clockwise(ROTATE_DEGREE))  # Send the command to rotate the drone right
-
-    def tilt_forward(self, event=None):
-        self.threaded_drone_command(lambda: self.me.move_forward(MOVE_DISTANCE))  # Send the command to tilt the drone forward
-
-    def tilt_backward(self, event=None):
-        self.threaded_drone_command(lambda: self.me.move_back(MOVE_DISTANCE))  # Send the command to tilt the drone backward
+    def start_burst(self, event=None):
+        self.capture.start_burst()  # Save the next frames as they arrive
 
     # Function to draw buttons on the tkinter canvas
     def draw_buttons(self):
@@ -250,6 +270,8 @@ class TelloApp:
         additional_controls = [
             ("toggle_tracking_btn", "Toggle Tracking", 325, 40),  # Moved tracking toggle to the middle
             ("exit_btn", "Exit", 10, 100),  # Combined exit button
+            ("snapshot_btn", "Snapshot", 325, 70),  # Full-resolution still
+            ("burst_btn", "Burst", 325, 100),  # Burst of full-resolution stills
         ]
 
         # Create and display additional buttons on the canvas
@@ -271,20 +293,30 @@ class TelloApp:
 
     # Function to update the displayed video stream
     def update_video(self):
-        frame_read = self.me.get_frame_read()
-        if frame_read is not None and frame_read.frame is not None:
-            my_frame = frame_read.frame
-            img = cv2.resize(my_frame, (w, h))
+        global pError, pError_y
+
+        frame = self.frames.poll(self.last_seq)  # Skip ticks without a new frame
+        if frame is not None:
+            self.last_seq = frame.seq
+            self.capture.offer(frame.image, frame.seq)  # Save the frame if a burst is running
+            img = cv2.resize(frame.image, (w, h))
             img, face_info = face_detect(img)  # Detect faces in the image
-            face_track(face_info)  # Track faces using PID control
+            if frame.is_stale():
+                rc.set_auto(0, 0, 0, 0)  # Don't steer on an old measurement
+                pError, pError_y = 0, 0  # Nor take a derivative across the gap
+            else:
+                face_track(face_info)  # Track faces using PID control
 
             img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
             image = Image.fromarray(img)
             self.photo = ImageTk.PhotoImage(image=image)
 
-            self.video_canvas.delete("all")  # Clear the previous video frame
-            self.video_canvas.create_image(0, 0, anchor=tk.NW, image=self.photo)  # Display the updated video frame
-            self.draw_buttons()  # Redraw the buttons on top of the video frame
+            self.video_canvas.itemconfig(self.image_id, image=self.photo)  # Display the updated video frame
+            self.video_canvas.delete("stream_status")  # The stream is back
+        elif self.monitor.is_down():
+            # Don't leave the last frame up as if it were live
+            self.video_canvas.delete("stream_status")
+            self.video_canvas.create_text(w // 2, h - 15, text="Video lost, reconnecting...", fill="red", tags="stream_status")
 
         self.window.after(50, self.update_video)  # Schedule the next video update after 50 milliseconds
 
@@ -0,0 +1,125 @@
+"""Compare the face detector backends on the same clips.
+
+    python benchmark_detectors.py clip1.mp4 clip2.mp4 --backends haar lbp dnn
+
+Throughput is frames per second of detect() alone, on frames already decoded
+and resized to the size the front-ends detect on. If a clip has a label file
+next to it (clip1.csv, rows of frame,x,y,w,h in clip pixels, one row per face)
+recall is the share of labelled faces matched at IoU >= 0.5. Without labels
+only the share of frames with any detection is reported.
+"""
+import argparse
+import csv
+import os
+import time
+import cv2
+import numpy as np
+from face_detectors import create_detector
+from face_tracks import iou_matrix, greedy_match
+
+MATCH_IOU = 0.5
+
+# Settings the front-ends use, so the comparison reflects what would fly
+BACKEND_SETTINGS = {
+    "haar": {"scale_factor": 1.2, "min_neighbors": 8},
+    "lbp": {"scale_factor": 1.2, "min_neighbors": 8},
+    "dnn": {"confidence": 0.5},
+}
+
+
+def load_clip(path, size, max_frames):
+    capture = cv2.VideoCapture(path)
+    frames = []
+    scale = None
+    while len(frames) < max_frames:
+        ok, frame = capture.read()
+        if not ok:
+            break
+        if scale is None:
+            scale = np.array([size[0] / frame.shape[1], size[1] / frame.shape[0]] * 2)
+        frames.append(cv2.resize(frame, size))
+    capture.release()
+    return frames, scale
+
+
+def load_labels(path, scale):
+    labels_path = os.path.splitext(path)[0] + ".csv"
+    if not os.path.exists(labels_path):
+        return None
+    labels = {}
+    with open(labels_path, newline="") as f:
+        for row in csv.reader(f):
+            if not row or not row[0].strip().isdigit():
+                continue  # Header or blank line
+            frame, box = int(row[0]), np.array([float(v) for v in row[1:5]])
+            labels.setdefault(frame, []).append(box * scale)
+    return labels
+
+
+def evaluate(detector, clips):
+    stats = {"frames": 0, "time": 0.0, "with_face": 0, "labelled_frames": 0, "labelled": 0, "matched": 0,
+             "extra": 0}
+    for frames, labels in clips:
+        for i, frame in enumerate(frames):
+            start = time.perf_counter()
+            boxes = detector.detect(frame)
+            stats["time"] += time.perf_counter() - start
+            stats["frames"] += 1
+            stats["with_face"] += len(boxes) > 0
+            if labels is None:
+                continue
+            truth = np.array(labels.get(i, []), float).reshape(-1, 4)
+            matches = []
+            stats["labelled_frames"] += 1
+            if len(truth) and len(boxes):
+                cost = 1 - iou_matrix(truth, boxes.astype(float))
+                cost[cost > 1 - MATCH_IOU] = np.inf
+                matches = greedy_match(cost)
+            stats["labelled"] += len(truth)
+            stats["matched"] += len(matches)
+            stats["extra"] += len(boxes) - len(matches)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("clips", nargs="+")
+    parser.add_argument("--backends", nargs="+", default=["haar", "lbp", "dnn"])
+    parser.add_argument("--size", default="360x240", help="frame size the front-ends detect on")
+    parser.add_argument("--input-size", help="WxH each backend resizes to before detecting")
+    parser.add_argument("--threads", type=int, help="OpenCV worker threads")
+    parser.add_argument("--max-frames", type=int, default=1000, help="frames read from each clip")
+    args = parser.parse_args()
+
+    size = tuple(int(v) for v in args.size.split("x"))
+    clips = []
+    for path in args.clips:
+        frames, scale = load_clip(path, size, args.max_frames)
+        if not frames:
+            print(f"Skipping {path}: no frames")
+            continue
+        clips.append((frames, load_labels(path, scale)))
+    if not clips:
+        return
+
+    print(f"{sum(len(f) for f, _ in clips)} frames from {len(clips)} clips at {size[0]}x{size[1]}")
+    print(f"{'backend':<8} {'fps':>8} {'ms/frame':>9} {'frames w/ face':>15} {'recall':>8} {'extra/frame':>12}")
+    for name in args.backends:
+        settings = dict(BACKEND_SETTINGS.get(name, {}), threads=args.threads)
+        if args.input_size:
+            settings["input_size"] = tuple(int(v) for v in args.input_size.split("x"))
+        try:
+            detector = create_detector(name, **settings)
+        except (IOError, cv2.error) as e:
+            print(f"{name:<8} skipped: {e}")
+            continue
+        detector.detect(clips[0][0][0])  # Warm up before timing
+        s = evaluate(detector, clips)
+        recall = f"{s['matched'] / s['labelled']:.1%}" if s["labelled"] else "n/a"
+        extra = f"{s['extra'] / s['labelled_frames']:.2f}" if s["labelled_frames"] else "n/a"
+        print(f"{name:<8} {s['frames'] / s['time']:8.1f} {s['time'] / s['frames'] * 1000:9.2f} "
+              f"{s['with_face'] / s['frames']:15.1%} {recall:>8} {extra:>12}")
+
+
+if __name__ == "__main__":
+    main()
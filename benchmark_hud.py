@@ -0,0 +1,99 @@
+"""Frame time of the HUD text in import cv2.py at full stream resolution.
+
+    python benchmark_hud.py
+
+Compares drawing every line with cv2.putText, which is what ships, against
+a cached layer: the battery text rendered once into a glyph mask and blended
+into the frame's ROI on every frame. Both paths draw the same pixels up to
+the blend's rounding, which is reported as the largest per-channel difference.
+"""
+import time
+import cv2
+import numpy as np
+
+# Full Tello stream resolution
+FRAME_W, FRAME_H = 960, 720
+FRAMES = 1000
+FONT = cv2.FONT_HERSHEY_SIMPLEX
+BATTERY_ORG, BATTERY_SCALE, BATTERY_COLOR = (0, 50), 0.7, (0, 100, 250)
+
+
+def put_values(img, p_error, p_error_y, area):
+    img = cv2.putText(img, 'pError:' + str(p_error), (0, 80), FONT, 0.5, (255, 100, 0), 1, cv2.LINE_AA)
+    img = cv2.putText(img, 'pError_y:' + str(p_error_y), (0, 100), FONT, 0.5, (255, 100, 0), 1, cv2.LINE_AA)
+    img = cv2.putText(img, 'Area:' + str(area), (0, 120), FONT, 0.5, (255, 100, 0), 1, cv2.LINE_AA)
+    return img
+
+
+def draw_put_text(img, battery, p_error, p_error_y, area):
+    # What import cv2.py does, battery_text is the cached reading
+    img = cv2.putText(img, battery, BATTERY_ORG, FONT, BATTERY_SCALE, BATTERY_COLOR, 1, cv2.LINE_AA)
+    return put_values(img, p_error, p_error_y, area)
+
+
+class CachedText:
+    """One text item pre-rendered as an alpha mask, re-rendered only when it changes."""
+
+    def __init__(self, org, scale, color):
+        self.org, self.scale = org, scale
+        self.color = np.array(color, np.uint16)
+        self.text = None
+
+    def render(self, text):
+        (tw, th), baseline = cv2.getTextSize(text, FONT, self.scale, 1)
+        self.x, self.y = self.org[0], self.org[1] - th - 1
+        mask = np.zeros((th + baseline + 2, tw + 2), np.uint8)
+        cv2.putText(mask, text, (0, th + 1), FONT, self.scale, 255, 1, cv2.LINE_AA)
+        self.alpha = mask.astype(np.uint16)[:, :, None]
+        self.text = text
+
+    def apply(self, img, text):
+        if text != self.text:
+            self.render(text)
+        h, w = self.alpha.shape[:2]
+        roi = img[self.y:self.y + h, self.x:self.x + w]
+        blended = (roi * (255 - self.alpha) + self.color * self.alpha + 127) // 255
+        roi[:] = blended
+        return img
+
+
+def draw_cached(layer, img, battery, p_error, p_error_y, area):
+    return put_values(layer.apply(img, battery), p_error, p_error_y, area)
+
+
+def values(i):
+    # Errors and area change every frame, battery every 300
+    return str(87 - i // 300), i % 120 - 60, i % 80 - 40, 8000 + i * 37 % 4000
+
+
+def run(draw):
+    frame = np.random.randint(0, 256, (FRAME_H, FRAME_W, 3), np.uint8)
+    times = []
+    for i in range(FRAMES):
+        img = frame.copy()  # Every stream frame is a fresh image
+        start = time.perf_counter()
+        draw(img, *values(i))
+        times.append(time.perf_counter() - start)
+    times.sort()
+    return sum(times) / len(times) * 1000, times[int(len(times) * 0.95)] * 1000
+
+
+def max_difference():
+    frame = np.random.randint(0, 256, (FRAME_H, FRAME_W, 3), np.uint8)
+    a = draw_put_text(frame.copy(), *values(0))
+    b = draw_cached(CachedText(BATTERY_ORG, BATTERY_SCALE, BATTERY_COLOR), frame.copy(), *values(0))
+    return int(np.abs(a.astype(int) - b.astype(int)).max())
+
+
+def main():
+    print(f"HUD text, {FRAME_W}x{FRAME_H}, {FRAMES} frames")
+    mean, p95 = run(draw_put_text)
+    print(f"  putText every frame:        mean {mean:.3f} ms, p95 {p95:.3f} ms")
+    layer = CachedText(BATTERY_ORG, BATTERY_SCALE, BATTERY_COLOR)
+    mean, p95 = run(lambda img, *v: draw_cached(layer, img, *v))
+    print(f"  cached battery layer:       mean {mean:.3f} ms, p95 {p95:.3f} ms")
+    print(f"  largest pixel difference:   {max_difference()} levels")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import cv2
+import numpy as np
+
+CAPTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "captures")  # Created on the first write
+POOL_SIZE = 16  # Full-resolution frame buffers shared by pending writes
+WRITERS = 2  # Encode/write threads, cv2.imwrite releases the GIL
+BURST_FRAMES = 30  # Frames grabbed by one burst
+JPEG_QUALITY = 95
+
+
+class FrameCapture:
+    """Saves stills without stalling the frame loop.
+
+    The caller only copies the full-resolution frame into a pooled buffer;
+    JPEG/PNG encoding and the disk write run on a small thread pool. If every
+    buffer is still waiting to be written the frame is dropped, never waited on.
+    """
+
+    def __init__(self, directory=CAPTURE_DIR, ext=".jpg", pool_size=POOL_SIZE, writers=WRITERS):
+        self.directory = directory
+        self.ext = ext
+        self.params = [cv2.IMWRITE_JPEG_QUALITY, JPEG_QUALITY] if ext == ".jpg" else []
+        self.pool_size = pool_size
+        self.free = queue.Queue()
+        self.allocated = 0
+        self.executor = ThreadPoolExecutor(max_workers=writers)
+        self.lock = threading.Lock()
+        self.burst_remaining = 0
+        self.burst = None  # Stats of the burst in progress
+        self.dropped = 0
+
+    def snapshot(self, image, seq=0, prefix="snapshot", on_done=None):
+        """Queue one frame for writing, returns False if it had to be dropped."""
+        buffer = self.take_buffer(image)
+        if buffer is None:
+            with self.lock:
+                self.dropped += 1
+            return False
+        np.copyto(buffer, image)
+        name = f"{prefix}_{time.strftime('%Y%m%d_%H%M%S')}_{seq:06d}{self.ext}"
+        self.executor.submit(self.write, buffer, os.path.join(self.directory, name), on_done)
+        return True
+
+    def start_burst(self, frames=BURST_FRAMES):
+        """Save the next frames as they arrive, ignored while a burst is still running."""
+        with self.lock:
+            burst = self.burst
+            if burst is not None and burst["written"] + burst["dropped"] < burst["requested"]:
+                print("Burst already running, ignored")
+                return False
+            self.burst_remaining = frames
+            self.burst = {"requested": frames, "written": 0, "dropped": 0, "bytes": 0,
+                          "started": time.perf_counter()}
+        return True
+
+    def offer(self, image, seq=0):
+        """Called with every new frame, saves it if a burst is running."""
+        with self.lock:
+            if self.burst_remaining <= 0:
+                return
+            self.burst_remaining -= 1
+            burst = self.burst
+        if not self.snapshot(image, seq, prefix="burst", on_done=lambda size: self.burst_written(burst, size)):
+            self.burst_written(burst, None)
+
+    def burst_written(self, burst, size):
+        with self.lock:
+            if size is None:
+                burst["dropped"] += 1
+            else:
+                burst["written"] += 1
+                burst["bytes"] += size
+            if burst["written"] + burst["dropped"] < burst["requested"]:
+                return
+        elapsed = time.perf_counter() - burst["started"]
+        written = burst["written"]
+        print(f"Burst: {written} frames in {elapsed:.2f}s ({written / elapsed:.1f} fps, "
+              f"{burst['bytes'] / elapsed / 1e6:.1f} MB/s), {burst['dropped']} dropped")
+
+    def take_buffer(self, image):
+        try:
+            buffer = self.free.get_nowait()
+        except queue.Empty:
+            with self.lock:
+                if self.allocated >= self.pool_size:
+                    return None
+                self.allocated += 1
+            return np.empty_like(image)
+        if buffer.shape != image.shape or buffer.dtype != image.dtype:
+            buffer = np.empty_like(image)
+        return buffer
+
+    def write(self, buffer, path, on_done):
+        size = None
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            if cv2.imwrite(path, buffer, self.params):
+                size = os.path.getsize(path)
+            else:
+                print(f"Could not write {path}")
+        except Exception as e:
+            print(f"Exception while writing capture: {e}")
+        finally:
+            self.free.put(buffer)
+        if on_done is not None:
+            on_done(size)
+
+    def close(self):
+        self.executor.shutdown(wait=True)
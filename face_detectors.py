@@ -0,0 +1,110 @@
+import inspect
+import os
+import cv2
+import numpy as np
+
+# Backend the front-ends fly with: haar, lbp or dnn
+FACE_DETECTOR = os.environ.get("FACE_DETECTOR", "haar")
+
+# Model files that don't ship with the opencv-python wheels. The LBP cascade is in
+# opencv/data/lbpcascades, the DNN files in opencv/samples/dnn/face_detector.
+MODEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "models")
+LBP_CASCADE = os.path.join(MODEL_DIR, "lbpcascade_frontalface_improved.xml")
+DNN_PROTOTXT = os.path.join(MODEL_DIR, "deploy.prototxt")
+DNN_WEIGHTS = os.path.join(MODEL_DIR, "res10_300x300_ssd_iter_140000.caffemodel")
+
+
+class FaceDetector:
+    """Common interface for the CPU face detector backends.
+
+    detect() returns an (N, 4) int array of x, y, w, h boxes in the coordinates
+    of the image passed in. With input_size set, the image is resized to
+    (width, height) before detection and the boxes are scaled back. threads
+    sets OpenCV's worker thread count; this setting applies to the whole
+    process, so it is reapplied on every call.
+    """
+
+    def __init__(self, input_size=None, threads=None):
+        self.input_size = input_size
+        self.threads = threads
+
+    def detect(self, img):
+        if self.threads is not None:
+            cv2.setNumThreads(self.threads)
+        h, w = img.shape[:2]
+        if self.input_size is not None and self.input_size != (w, h):
+            small = cv2.resize(img, self.input_size, interpolation=cv2.INTER_AREA)
+            scale = np.array([w / self.input_size[0], h / self.input_size[1]] * 2)
+        else:
+            small = img
+            scale = None
+        boxes = np.asarray(self.detect_boxes(small), float).reshape(-1, 4)
+        if scale is not None:
+            boxes *= scale
+        return boxes.astype(int)
+
+    def detect_boxes(self, img):
+        raise NotImplementedError
+
+
+class CascadeDetector(FaceDetector):
+    def __init__(self, path, scale_factor=1.2, min_neighbors=8, min_size=None, input_size=None, threads=None):
+        super().__init__(input_size, threads)
+        self.cascade = cv2.CascadeClassifier(path)
+        if self.cascade.empty():
+            raise IOError(f"Could not load cascade {path}")
+        self.scale_factor = scale_factor
+        self.min_neighbors = min_neighbors
+        self.min_size = min_size
+
+    def detect_boxes(self, img):
+        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        if self.min_size is None:
+            return self.cascade.detectMultiScale(gray, self.scale_factor, self.min_neighbors)
+        return self.cascade.detectMultiScale(gray, self.scale_factor, self.min_neighbors, minSize=self.min_size)
+
+
+class HaarDetector(CascadeDetector):
+    def __init__(self, scale_factor=1.2, min_neighbors=8, min_size=None, input_size=None, threads=None):
+        super().__init__(cv2.data.haarcascades + "haarcascade_frontalface_default.xml",
+                         scale_factor, min_neighbors, min_size, input_size, threads)
+
+
+class LbpDetector(CascadeDetector):
+    def __init__(self, scale_factor=1.2, min_neighbors=8, min_size=None, input_size=None, threads=None,
+                 path=LBP_CASCADE):
+        super().__init__(path, scale_factor, min_neighbors, min_size, input_size, threads)
+
+
+class DnnDetector(FaceDetector):
+    """OpenCV's ResNet-10 SSD face detector."""
+
+    def __init__(self, confidence=0.5, input_size=(300, 300), threads=None,
+                 prototxt=DNN_PROTOTXT, weights=DNN_WEIGHTS):
+        super().__init__(input_size, threads)
+        self.net = cv2.dnn.readNetFromCaffe(prototxt, weights)
+        self.confidence = confidence
+
+    def detect_boxes(self, img):
+        h, w = img.shape[:2]
+        blob = cv2.dnn.blobFromImage(img, 1.0, (w, h), (104.0, 177.0, 123.0))
+        self.net.setInput(blob)
+        out = self.net.forward()[0, 0]  # Rows of (image_id, label, confidence, x1, y1, x2, y2)
+        out = out[out[:, 2] > self.confidence]
+        corners = np.clip(out[:, 3:7], 0, 1) * [w, h, w, h]
+        return np.column_stack([corners[:, :2], corners[:, 2:] - corners[:, :2]])
+
+
+DETECTORS = {
+    "haar": HaarDetector,
+    "lbp": LbpDetector,
+    "dnn": DnnDetector,
+}
+
+
+def create_detector(name=FACE_DETECTOR, **kwargs):
+    """Build a backend by name. Settings the backend doesn't take are dropped, so
+    cascade settings can be passed whichever backend is selected."""
+    cls = DETECTORS[name]
+    params = inspect.signature(cls).parameters
+    return cls(**{k: v for k, v in kwargs.items() if k in params})
@@ -0,0 +1,158 @@
+import numpy as np
+
+MAX_MISSES = 5  # Frames a track coasts on its predicted position without a detection
+MIN_HITS = 2  # Detections before a new track can be picked as the target
+MIN_IOU = 0.1  # Below this overlap a pair is matched on centroid distance instead
+VELOCITY_SMOOTHING = 0.5  # Weight of the newest motion in the velocity estimate
+
+
+class FaceTrack:
+    __slots__ = ("id", "box", "measured", "velocity", "hits", "misses")
+
+    def __init__(self, track_id, box):
+        self.id = track_id
+        self.box = box.copy()  # Predicted box (x, y, w, h), equal to the detection when matched
+        self.measured = box.copy()  # Last detected box
+        self.velocity = np.zeros(2)  # Top-left motion in pixels per frame
+        self.hits = 1
+        self.misses = 0
+
+    def center(self):
+        x, y, w, h = self.box
+        return int(x + w // 2), int(y + h // 2)
+
+    def area(self):
+        return int(self.box[2] * self.box[3])
+
+    def face_info(self):
+        """The [[cx, cy], area] format face_track() expects."""
+        return [list(self.center()), self.area()]
+
+
+def iou_matrix(a, b):
+    """Pairwise IoU of (N, 4) and (M, 4) arrays of x, y, w, h boxes."""
+    ax1, ay1 = a[:, 0:1], a[:, 1:2]
+    ax2, ay2 = ax1 + a[:, 2:3], ay1 + a[:, 3:4]
+    bx1, by1 = b[None, :, 0], b[None, :, 1]
+    bx2, by2 = bx1 + b[None, :, 2], by1 + b[None, :, 3]
+    inter_w = np.clip(np.minimum(ax2, bx2) - np.maximum(ax1, bx1), 0, None)
+    inter_h = np.clip(np.minimum(ay2, by2) - np.maximum(ay1, by1), 0, None)
+    inter = inter_w * inter_h
+    union = a[:, 2:3] * a[:, 3:4] + b[None, :, 2] * b[None, :, 3] - inter
+    return inter / np.maximum(union, 1e-9)
+
+
+def cost_matrix(tracks, detections):
+    """1 - IoU for overlapping pairs, 1 + normalised centroid distance for close
+    pairs that barely overlap, inf for pairs too far apart to be the same face."""
+    iou = iou_matrix(tracks, detections)
+    track_centers = tracks[:, :2] + tracks[:, 2:] / 2
+    det_centers = detections[:, :2] + detections[:, 2:] / 2
+    dist = np.linalg.norm(track_centers[:, None, :] - det_centers[None, :, :], axis=2)
+    gate = np.maximum(tracks[:, 2:3], tracks[:, 3:4])  # One face size around the track
+    cost = np.where(iou >= MIN_IOU, 1 - iou, 1 + dist / gate)
+    cost[(iou < MIN_IOU) & (dist > gate)] = np.inf
+    return cost
+
+
+def greedy_match(cost):
+    """Match rows to columns cheapest pair first, returns a list of (row, col)."""
+    if cost.size == 0:
+        return []
+    rows_used = np.zeros(cost.shape[0], bool)
+    cols_used = np.zeros(cost.shape[1], bool)
+    matches = []
+    for flat in np.argsort(cost, axis=None):
+        r, c = divmod(int(flat), cost.shape[1])
+        if not np.isfinite(cost[r, c]):
+            break
+        if rows_used[r] or cols_used[c]:
+            continue
+        rows_used[r] = cols_used[c] = True
+        matches.append((r, c))
+        if len(matches) == min(cost.shape):
+            break
+    return matches
+
+
+class FaceTracker:
+    """Associates face detections across frames and keeps stable track IDs.
+
+    The tracker stays locked on one selected ID instead of jumping to whichever
+    face is largest. A face that is missed for a few frames coasts on its last
+    velocity. When the selected track is lost the largest confirmed face is
+    picked.
+    """
+
+    def __init__(self, max_misses=MAX_MISSES):
+        self.max_misses = max_misses
+        self.tracks = []
+        self.next_id = 1
+        self.selected_id = None
+
+    def update(self, detections):
+        detections = np.asarray(detections, float).reshape(-1, 4)
+
+        for track in self.tracks:
+            track.box[:2] += track.velocity
+
+        if self.tracks and len(detections):
+            boxes = np.array([track.box for track in self.tracks])
+            matches = greedy_match(cost_matrix(boxes, detections))
+        else:
+            matches = []
+
+        matched_tracks = set()
+        matched_detections = set()
+        for ti, di in matches:
+            track = self.tracks[ti]
+            box = detections[di]
+            motion = (box[:2] - track.measured[:2]) / (track.misses + 1)
+            track.velocity = VELOCITY_SMOOTHING * motion + (1 - VELOCITY_SMOOTHING) * track.velocity
+            track.box = box.copy()
+            track.measured = box.copy()
+            track.hits += 1
+            track.misses = 0
+            matched_tracks.add(ti)
+            matched_detections.add(di)
+
+        for ti, track in enumerate(self.tracks):
+            if ti not in matched_tracks:
+                track.misses += 1
+        self.tracks = [track for track in self.tracks if track.misses <= self.max_misses]
+
+        for di, box in enumerate(detections):
+            if di not in matched_detections:
+                self.tracks.append(FaceTrack(self.next_id, box))
+                self.next_id += 1
+
+        if self.target() is None:
+            self.selected_id = None
+            confirmed = [track for track in self.tracks if track.hits >= MIN_HITS]
+            if confirmed:
+                self.selected_id = max(confirmed, key=FaceTrack.area).id
+
+        return self.tracks
+
+    def target(self):
+        for track in self.tracks:
+            if track.id == self.selected_id:
+                return track
+        return None
+
+    def select(self, track_id):
+        self.selected_id = track_id
+
+    def select_next(self):
+        """Move the lock to the next track by ID, wrapping around."""
+        ids = sorted(track.id for track in self.tracks if track.hits >= MIN_HITS)
+        if not ids:
+            return
+        later = [i for i in ids if self.selected_id is None or i > self.selected_id]
+        self.selected_id = later[0] if later else ids[0]
+
+    def target_face_info(self):
+        track = self.target()
+        if track is None:
+            return [[0, 0], 0]
+        return track.face_info()
@@ -0,0 +1,111 @@
+import threading
+import time
+
+POLL_INTERVAL = 0.005  # Seconds between checks for a newly decoded frame
+MAX_FRAME_AGE = 0.2  # Frames older than this are too stale to steer on
+
+
+class Frame:
+    """A decoded video frame stamped with a sequence number and capture time."""
+
+    __slots__ = ("seq", "timestamp", "image")
+
+    def __init__(self, seq, timestamp, image):
+        self.seq = seq
+        self.timestamp = timestamp
+        self.image = image
+
+    def age(self):
+        return time.monotonic() - self.timestamp
+
+    def is_stale(self, max_age=MAX_FRAME_AGE):
+        return self.age() > max_age
+
+
+class FrameSource:
+    """Wraps Tello's background frame reader and numbers each new frame.
+
+    djitellopy replaces frame_read.frame with a new array on every decode, so
+    a change of object identity means a new frame. Consumers pass the last
+    sequence number they handled and either block (next_frame) or skip (poll)
+    until a newer frame is available, so no stage processes a frame twice.
+    The array a reader holds when it is handed over is its blank placeholder,
+    it is never published.
+    """
+
+    def __init__(self, frame_read, poll_interval=POLL_INTERVAL):
+        self.frame_read = frame_read
+        self.placeholder = frame_read.frame
+        self.poll_interval = poll_interval
+        self.condition = threading.Condition()
+        self.latest = None
+        self.seq = 0
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def start(self):
+        if self.thread is not None and self.thread.is_alive():
+            return
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        with self.condition:
+            self.condition.notify_all()
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join(timeout=1.0)
+        self.thread = None
+
+    def set_reader(self, frame_read):
+        """Swap in a new background frame reader after the stream was restarted."""
+        self.placeholder = frame_read.frame
+        self.frame_read = frame_read
+
+    def run(self):
+        frame_read = None
+        last_image = None
+        while not self.stop_event.is_set():
+            if self.frame_read is not frame_read:
+                # New reader, skip the placeholder it started with
+                frame_read = self.frame_read
+                last_image = self.placeholder
+            image = frame_read.frame
+            if image is not None and image is not last_image:
+                last_image = image
+                self.publish(image)
+            self.stop_event.wait(self.poll_interval)
+
+    def publish(self, image, timestamp=None):
+        if timestamp is None:
+            timestamp = time.monotonic()
+        with self.condition:
+            self.seq += 1
+            self.latest = Frame(self.seq, timestamp, image)
+            self.condition.notify_all()
+
+    def poll(self, last_seq=0):
+        """Return the newest frame if it is newer than last_seq, otherwise None."""
+        with self.condition:
+            if self.latest is not None and self.latest.seq > last_seq:
+                return self.latest
+            return None
+
+    def next_frame(self, last_seq=0, timeout=None):
+        """Block until a frame newer than last_seq arrives, None on timeout or stop."""
+        with self.condition:
+            self.condition.wait_for(
+                lambda: self.stop_event.is_set() or (self.latest is not None and self.latest.seq > last_seq),
+                timeout=timeout,
+            )
+            if self.latest is not None and self.latest.seq > last_seq:
+                return self.latest
+            return None
+
+    def frame_age(self):
+        """Seconds since the newest frame was decoded, None before the first frame."""
+        with self.condition:
+            if self.latest is None:
+                return None
+            return self.latest.age()
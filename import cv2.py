@@ -5,6 +5,11 @@ import time          # Time for sleep and time-related operations
 import logging       # Logging for managing logs
 from djitellopy import Tello  # Import the Tello library for drone control
 import threading     # Threading for parallel processing
+from frame_source import FrameSource  # Sequence-numbered frames from the video stream
+from stream_health import StreamMonitor  # Stall detection and video reconnect
+from face_tracks import FaceTracker  # Stable face IDs across frames
+from capture import FrameCapture  # Background snapshot and burst writes
+from face_detectors import FACE_DETECTOR, create_detector  # Face detector backends (haar, lbp, dnn)
 
 # Initialize Tello drone
 def init_tello():
@@ -34,46 +39,59 @@ pid = [0.35, 0.35, 0]
 pError = 0
 pError_y = 0
 
+# Flight state for the 'T' and 'L' keys
+takeoff = False
+land = False
+
 # Face limit area (defines the size range of the detected face)
 faceLimitArea = [8000, 10000]
 
+# Seconds between battery readings shown on the HUD
+BATTERY_INTERVAL = 5.0
+
 # Initialize Tello drone
 tello = init_tello()
 
-# Get frame from Tello's stream
-def get_frame(tello, w=w, h=h):
-    tello_frame = tello.get_frame_read().frame  # Read a frame from the drone's video stream
-    return cv2.resize(tello_frame, (w, h))  # Resize the frame to the specified width and height
+# Number the decoded frames so each one is processed only once
+frame_source = FrameSource(tello.get_frame_read())
+frame_source.start()
+
+# Zero the rc output and reconnect the video in the background if the stream stalls
+stream_monitor = StreamMonitor(tello, frame_source)
+stream_monitor.start()
+
+# Get the next new frame from Tello's stream, None if none arrived within the timeout
+def get_frame(last_seq, w=w, h=h, timeout=0.1):
+    frame = frame_source.next_frame(last_seq, timeout=timeout)  # Wait for a frame we haven't seen yet
+    if frame is None:
+        return None, None
+    return frame, cv2.resize(frame.image, (w, h))  # Resize the frame to the specified width and height
+
+# Full-resolution stills, encoded and written off the video loop
+frame_capture = FrameCapture()
+
+# Associate detected faces across frames so the lock stays on one person
+face_tracker = FaceTracker()
+
+# Face detector, loaded once (set FACE_DETECTOR=lbp or dnn to fly another backend)
+face_detector = create_detector(FACE_DETECTOR, scale_factor=1.2, min_neighbors=8)
 
 # Detect frontal faces in the given image
 def face_detect(img):
-    # Load Haar Cascade classifier for detecting frontal faces
-    frontal_face = cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_frontalface_default.xml")
-    img_gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)  # Convert the image to grayscale
-    img_faces = frontal_face.detectMultiScale(img_gray, 1.2, 8)  # Detect faces in the grayscale image
-
-    # Initialize lists to store detected faces and their areas
-    face_list = []
-    face_list_area = []
-
-    # Iterate over detected faces and draw rectangles around them
-    for (x, y, w, h) in img_faces:
-        cv2.rectangle(img, (x, y), (x + w, y + h), (0, 255, 0), 2)  # Draw a rectangle around each detected face
-
-        # Calculate the center coordinates and area of the detected face
-        cx = x + w // 2
-        cy = y + h // 2
-
-        # Store the detected face's coordinates and area
-        face_list.append([cx, cy])
-        face_list_area.append(w * h)
-
-    # Check if faces were detected
-    if len(face_list_area) != 0:
-        i = face_list_area.index(max(face_list_area))  # Find the index of the largest detected face
-        return img, [face_list[i], face_list_area[i]]  # Return the image and information about the largest detected face
-    else:
-        return img, [[0, 0], 0]  # Return the image with no detected faces
+    img_faces = face_detector.detect(img)  # Detect faces in the image
+
+    # Match the detections to the existing face tracks
+    tracks = face_tracker.update(img_faces)
+
+    # Draw every tracked face with its ID, the selected one in red
+    for track in tracks:
+        x, y, w, h = track.box.astype(int)
+        color = (0, 0, 255) if track.id == face_tracker.selected_id else (0, 255, 0)
+        cv2.rectangle(img, (x, y), (x + w, y + h), color, 2)
+        cv2.putText(img, str(track.id), (x, y - 5), cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 1, cv2.LINE_AA)
+
+    # Return the image and information about the selected face ([[0, 0], 0] if there is none)
+    return img, face_tracker.target_face_info()
 
 # Track a face smoothly using PID control
 def face_track(tello, face_info, w, h, pid, pError, pError_y):
@@ -120,10 +138,14 @@ def face_track(tello, face_info, w, h, pid, pError, pError_y):
 # Function for video streaming and face tracking
 def video_stream_and_face_track():
     global takeoff, land, pError, pError_y
+    last_seq = 0
+    target_id = None  # Face track pError and pError_y belong to
+    last_battery_check = 0
+    battery_text = ""
 
     while True:
-        # Stream video and get a frame from the drone
-        img = get_frame(tello, w, h)
+        # Stream video and get a new frame from the drone
+        frame, img = get_frame(last_seq, w, h)
 
         # Take off Tello when 'T' is pressed
         key = cv2.waitKey(1) & 0xFF
@@ -139,23 +161,54 @@ def video_stream_and_face_track():
         # Land Tello when 'L' is pressed
         elif key == ord('l') and land:
             try:
+                stream_monitor.stop()  # A deliberate streamoff is not a stall to recover from
                 tello.streamoff()  # Turn off video streaming
                 tello.land()  # Land the drone
             except:
                 pass
+        # Press 'N' to move the lock to the next tracked face
+        elif key == ord('n'):
+            face_tracker.select_next()
+        # Press 'P' for a snapshot, 'B' for a burst
+        elif key == ord('p'):
+            latest = frame_source.poll()  # Newest frame, even if none arrived on this pass
+            if latest is not None:
+                frame_capture.snapshot(latest.image, latest.seq)
+        elif key == ord('b'):
+            frame_capture.start_burst()
 
         # Press 'Q' to exit the program
         if key == ord('q'):
             break
 
+        # No new frame since the last pass, nothing to process
+        if frame is None:
+            continue
+        last_seq = frame.seq
+        frame_capture.offer(frame.image, frame.seq)  # Save the frame if a burst is running
+
         # Detect faces in the frame
         img, face_info = face_detect(img)
 
-        # Track the detected face smoothly
-        pError, pError_y = face_track(tello, face_info, w, h, pid, pError, pError_y)
+        # The lock moved to another face, don't take a derivative across two faces
+        if face_tracker.selected_id != target_id:
+            target_id = face_tracker.selected_id
+            pError, pError_y = 0, 0
+
+        # Track the detected face smoothly, but never steer on a stale frame
+        if frame.is_stale():
+            tello.send_rc_control(0, 0, 0, 0)
+            pError, pError_y = 0, 0
+        else:
+            pError, pError_y = face_track(tello, face_info, w, h, pid, pError, pError_y)
+
+        # Refresh the battery level only every few seconds
+        if time.time() - last_battery_check > BATTERY_INTERVAL:
+            battery_text = str(tello.get_battery())
+            last_battery_check = time.time()
 
         # Display the image frame with additional information (battery level, errors, and area)
-        img = cv2.putText(img, str(tello.get_battery()), (0, 50), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 100, 250), 1,
+        img = cv2.putText(img, battery_text, (0, 50), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 100, 250), 1,
                           cv2.LINE_AA)
         img = cv2.putText(img, str('pError:' + str(pError)), (0, 80), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 100, 0), 1,
                           cv2.LINE_AA)
@@ -173,5 +226,9 @@ video_thread.start()  # Start the video processing thread
 video_thread.join()
 
 # Turn off video streaming and close OpenCV windows
+stream_monitor.stop()
+frame_source.stop()
+frame_capture.close()
+print(stream_monitor.report())
 tello.streamoff()
 cv2.destroyAllWindows()
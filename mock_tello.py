@@ -0,0 +1,138 @@
+import logging
+import threading
+import time
+import cv2
+import numpy as np
+
+FRAME_W, FRAME_H = 960, 720  # Tello stream resolution
+FPS = 30
+COMMAND_DELAY = 0.05  # Seconds a mocked blocking command takes
+BLOB_COLOR = (150, 170, 200)  # BGR of the synthetic face-sized blob
+BLOB_RADIUS = 60
+
+
+class MockFrameRead:
+    """Stands in for djitellopy's BackgroundFrameRead.
+
+    Plays a recorded video on a loop, or draws a synthetic moving face-sized
+    blob when no video is given. Like djitellopy, .frame starts as a blank
+    placeholder and every decoded frame is a new array assigned to it.
+    """
+
+    def __init__(self, video=None, fps=FPS):
+        self.video = video
+        self.period = 1.0 / fps
+        self.frame = np.zeros((FRAME_H, FRAME_W, 3), np.uint8)
+        self.stopped = False
+        self.frames = 0
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def run(self):
+        capture = cv2.VideoCapture(self.video) if self.video else None
+        background = np.zeros((FRAME_H, FRAME_W, 3), np.uint8)
+        background[:] = np.linspace(40, 160, FRAME_W, dtype=np.uint8)[None, :, None]
+        next_tick = time.monotonic()
+        while not self.stopped:
+            if capture is not None:
+                ok, frame = capture.read()
+                if not ok:  # Loop the recording
+                    capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                    continue
+            else:
+                frame = background.copy()
+                t = self.frames / FPS
+                cx = int(FRAME_W / 2 + FRAME_W / 4 * np.sin(t / 3))
+                cy = int(FRAME_H / 2 + FRAME_H / 6 * np.sin(t / 2))
+                cv2.circle(frame, (cx, cy), BLOB_RADIUS, BLOB_COLOR, -1)
+            self.frame = frame
+            self.frames += 1
+
+            next_tick += self.period
+            delay = next_tick - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_tick = time.monotonic()
+        if capture is not None:
+            capture.release()
+
+    def stop(self):
+        self.stopped = True
+
+
+class MockTello:
+    """Enough of djitellopy.Tello for the front-ends to run without a drone."""
+
+    LOGGER = logging.getLogger("mock_tello")
+    video = None  # Recording played by every MockFrameRead, synthetic if None
+    instances = []  # Every MockTello created, so a harness can inspect the commands sent
+
+    def __init__(self, *args, **kwargs):
+        MockTello.instances.append(self)
+        self.background_frame_read = None
+        self.stream_on = False
+        self.commands = 0
+        self.rc_commands = 0
+        self.last_rc = (0, 0, 0, 0)
+
+    def command(self):
+        self.commands += 1
+        time.sleep(COMMAND_DELAY)
+
+    def connect(self, *args):
+        self.command()
+
+    def get_battery(self):
+        return 80
+
+    def streamon(self):
+        self.command()
+        self.stream_on = True
+
+    def streamoff(self):
+        self.command()
+        self.stream_on = False
+
+    def get_frame_read(self, *args, **kwargs):
+        if self.background_frame_read is None:
+            self.background_frame_read = MockFrameRead(self.video)
+        return self.background_frame_read
+
+    def send_rc_control(self, left_right, for_back, up_down, yaw):
+        self.rc_commands += 1
+        self.last_rc = (left_right, for_back, up_down, yaw)
+
+    def takeoff(self):
+        self.command()
+
+    def land(self):
+        self.command()
+
+    def move_up(self, x):
+        self.command()
+
+    def move_down(self, x):
+        self.command()
+
+    def move_left(self, x):
+        self.command()
+
+    def move_right(self, x):
+        self.command()
+
+    def move_forward(self, x):
+        self.command()
+
+    def move_back(self, x):
+        self.command()
+
+    def rotate_clockwise(self, x):
+        self.command()
+
+    def rotate_counter_clockwise(self, x):
+        self.command()
+
+    def end(self):
+        if self.background_frame_read is not None:
+            self.background_frame_read.stop()
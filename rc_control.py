@@ -0,0 +1,152 @@
+import threading
+import time
+
+RC_RATE_HZ = 20  # rc packets per second sent by the stream thread
+RC_LIMIT = 100  # send_rc_control accepts -100..100 on every axis
+MANUAL_SPEED = 50  # Velocity used while a manual button or key is held
+RELEASE_GRACE = 0.03  # Seconds a release waits for a key auto-repeat press
+KEY_HOLD_TIMEOUT = 1.0  # Seconds a key press lasts unless auto-repeat presses it again
+
+# Velocity direction (left_right, for_back, up_down, yaw) for each movement button tag
+MANUAL_AXES = {
+    "left_btn": (-1, 0, 0, 0),
+    "right_btn": (1, 0, 0, 0),
+    "tilt_forward_btn": (0, 1, 0, 0),
+    "tilt_backward_btn": (0, -1, 0, 0),
+    "up_btn": (0, 0, 1, 0),
+    "down_btn": (0, 0, -1, 0),
+    "yaw_left_btn": (0, 0, 0, -1),
+    "yaw_right_btn": (0, 0, 0, 1),
+}
+
+# Keyboard keys mirroring the movement buttons
+MANUAL_KEYS = {
+    "a": "left_btn",
+    "d": "right_btn",
+    "w": "tilt_forward_btn",
+    "s": "tilt_backward_btn",
+    "Up": "up_btn",
+    "Down": "down_btn",
+    "Left": "yaw_left_btn",
+    "Right": "yaw_right_btn",
+}
+
+
+def clip(value, limit=RC_LIMIT):
+    return int(max(-limit, min(value, limit)))
+
+
+class RcController:
+    """Streams send_rc_control velocities to the drone from one fixed-rate thread.
+
+    Buttons and keys only change the held velocities, the sender thread picks
+    them up on its next tick. Manual input overrides the automatic (tracking)
+    command while anything is held. A press given a timeout expires unless it
+    is pressed again in time, so a key whose release went to another window
+    can't keep the drone moving.
+    """
+
+    def __init__(self, tello, rate_hz=RC_RATE_HZ):
+        self.tello = tello
+        self.period = 1.0 / rate_hz
+        self.lock = threading.Lock()
+        self.held = {}  # Input name -> (left_right, for_back, up_down, yaw)
+        self.released = {}  # Input name -> time the release was requested
+        self.expires = {}  # Input name -> time a press with a timeout lapses
+        self.auto = (0, 0, 0, 0)
+        self.inhibited = False  # Forces zero output, e.g. while the video stream is down
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def start(self):
+        if self.thread is not None and self.thread.is_alive():
+            return
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join(timeout=1.0)
+        self.thread = None
+
+    def press(self, name, speed=MANUAL_SPEED, timeout=None):
+        axes = MANUAL_AXES[name]
+        with self.lock:
+            self.held[name] = tuple(a * speed for a in axes)
+            self.released.pop(name, None)
+            if timeout is None:
+                self.expires.pop(name, None)
+            else:
+                self.expires[name] = time.monotonic() + timeout
+
+    def release(self, name):
+        with self.lock:
+            if name in self.held:
+                self.released[name] = time.monotonic()
+
+    def release_all(self):
+        with self.lock:
+            self.held.clear()
+            self.released.clear()
+            self.expires.clear()
+
+    def set_auto(self, left_right, for_back, up_down, yaw):
+        with self.lock:
+            self.auto = (left_right, for_back, up_down, yaw)
+
+    def inhibit(self, inhibited=True):
+        with self.lock:
+            self.inhibited = inhibited
+
+    def manual_active(self):
+        with self.lock:
+            return bool(self.held)
+
+    def current_command(self):
+        now = time.monotonic()
+        with self.lock:
+            for name, released_at in list(self.released.items()):
+                if now - released_at >= RELEASE_GRACE:
+                    self.drop(name)
+            for name, expires_at in list(self.expires.items()):
+                if now >= expires_at:
+                    self.drop(name)
+
+            if self.inhibited:
+                return (0, 0, 0, 0)
+            if not self.held:
+                return tuple(clip(v) for v in self.auto)
+
+            command = [0, 0, 0, 0]
+            for axes in self.held.values():
+                for i, v in enumerate(axes):
+                    command[i] += v
+            return tuple(clip(v) for v in command)
+
+    def drop(self, name):
+        # Caller holds the lock
+        self.held.pop(name, None)
+        self.released.pop(name, None)
+        self.expires.pop(name, None)
+
+    def run(self):
+        next_tick = time.monotonic()
+        while not self.stop_event.is_set():
+            try:
+                self.tello.send_rc_control(*self.current_command())
+            except Exception as e:
+                print(f"Exception while sending rc control: {e}")
+
+            next_tick += self.period
+            delay = next_tick - time.monotonic()
+            if delay < 0:  # Fell behind, don't burst to catch up
+                next_tick = time.monotonic()
+                delay = 0
+            self.stop_event.wait(delay)
+
+        try:
+            self.tello.send_rc_control(0, 0, 0, 0)
+        except Exception as e:
+            print(f"Exception while sending rc control: {e}")
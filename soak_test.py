@@ -0,0 +1,378 @@
+"""Endurance run of a front-end against a mock drone.
+
+Runs the chosen front-end script unchanged, with djitellopy replaced by
+mock_tello, for hours. It drives the command path through the front-end's own
+key and button bindings and samples RSS, Python heap objects, live threads,
+frame latency (from the frame being published to it being displayed) and the
+displayed frame rate. Without a recording, the face detector is wrapped so it
+also reports the synthetic blob as a face, which keeps the tracking path that
+sets rc under load; golden's tracking is switched on for the same reason. The run fails if any of them trends the wrong way,
+upward or for the frame rate downward, beyond the tolerance. It also fails if
+a held movement button does not drive its rc axis, or if the axis does not
+return to zero after the button is released.
+
+    python soak_test.py golden --hours 3 --video flight.mp4 --csv soak.csv
+"""
+import argparse
+import csv
+import gc
+import os
+import runpy
+import statistics
+import sys
+import threading
+import time
+import types
+import tkinter as tk
+import cv2
+import numpy as np
+import face_detectors
+import frame_source
+import mock_tello
+from rc_control import MANUAL_AXES, MANUAL_KEYS, MANUAL_SPEED
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# Canvas points of the start button, the Left movement button and the tracking toggle
+FRONTENDS = {
+    "ui": {"script": "ui.py", "start": (15, 15), "move": (95, 25), "toggle": None},
+    "finished": {"script": "FINISHED DRONE PROJECT.py", "start": (15, 15), "move": (95, 25), "toggle": None},
+    "golden": {"script": "Fully finished, golden.py", "start": (60, 20), "move": (200, 80), "toggle": (340, 50)},
+    "opencv": {"script": "import cv2.py", "start": None, "move": None, "toggle": None},
+}
+MOVE_TAG = "left_btn"  # Tag of the movement button at the "move" point
+COMMAND_INTERVAL = 2.0  # Seconds between driven commands
+KEY_HOLD = 0.3  # Seconds a manual key is held down
+TAKEOFF_EVERY = 10  # Every n-th command is a takeoff click, which spawns a command thread
+HOLD_STEP = 3  # Step within each TAKEOFF_EVERY cycle that holds a movement button
+RELEASE_CHECK = 0.25  # Seconds after a button release by which its rc axis must be zero
+LATENCY_FLOOR = 0.01  # Latency growth below this many seconds is never a failure
+
+
+def rss_mb():
+    if psutil is not None:
+        return psutil.Process().memory_info().rss / 1e6
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3  # Peak, not current
+
+
+class Sampler:
+    """Samples process health from a background thread."""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.samples = []
+        self.latencies = []
+        self.pending = None  # Frame picked up by the front-end but not yet displayed
+        self.displayed = 0
+        self.lock = threading.Lock()
+        self.started = time.monotonic()
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def record_frame(self, frame):
+        with self.lock:
+            self.pending = frame
+
+    def record_display(self):
+        with self.lock:
+            if self.pending is None:
+                return
+            self.latencies.append(self.pending.age())
+            self.pending = None
+            self.displayed += 1
+
+    def run(self):
+        while not self.stop_event.wait(self.interval):
+            self.sample()
+
+    def sample(self):
+        with self.lock:
+            latencies, self.latencies = self.latencies, []
+            displayed, self.displayed = self.displayed, 0
+        self.samples.append({
+            "t": time.monotonic() - self.started,
+            "rss_mb": rss_mb(),
+            "objects": len(gc.get_objects()),
+            "threads": threading.active_count(),
+            "latency_ms": statistics.median(latencies) * 1000 if latencies else None,
+            "fps": displayed / self.interval,
+        })
+        s = self.samples[-1]
+        latency = f"{s['latency_ms']:.1f} ms" if s["latency_ms"] is not None else "-"
+        print(f"[{s['t']:8.0f}s] rss {s['rss_mb']:.1f} MB, objects {s['objects']}, "
+              f"threads {s['threads']}, latency {latency}, {s['fps']:.1f} fps")
+
+
+class SyntheticFaceDetector:
+    """Runs the front-end's detector and adds the mock's blob as a face.
+
+    The flat blob never trips a real detector, so without this the
+    detect -> FaceTracker -> rc tracking path would sit idle. The real backend
+    still runs on every frame, so its cost stays in the measurements.
+    """
+
+    def __init__(self, detector):
+        self.detector = detector
+        self.low = np.array([max(c - 10, 0) for c in mock_tello.BLOB_COLOR], np.uint8)
+        self.high = np.array([min(c + 10, 255) for c in mock_tello.BLOB_COLOR], np.uint8)
+
+    def detect(self, img):
+        boxes = self.detector.detect(img)
+        points = cv2.findNonZero(cv2.inRange(img, self.low, self.high))
+        if points is None:
+            return boxes
+        return np.vstack([boxes.reshape(-1, 4), np.array(cv2.boundingRect(points)).reshape(1, 4)])
+
+
+class Driver:
+    """Presses keys and buttons on the front-end at a steady pace and ends the run."""
+
+    def __init__(self, frontend, duration, captures, on_finish):
+        self.frontend = frontend
+        self.duration = duration
+        self.captures = captures
+        self.on_finish = on_finish  # Called before the front-end starts tearing down
+        self.keys = list(MANUAL_KEYS)
+        self.step_count = 0
+        self.started = time.monotonic()
+        self.last_step = 0.0
+        self.root = None
+        self.failures = []
+
+    # Tk front-ends: events are generated on the canvas so the real bindings run
+    def attach(self, root):
+        if self.root is not None:
+            return
+        self.root = root
+        if self.frontend["toggle"] is not None:
+            root.after(int(COMMAND_INTERVAL * 500), lambda: self.click(self.frontend["toggle"]))
+        root.after(int(COMMAND_INTERVAL * 1000), self.tk_step)
+        root.after(int(self.duration * 1000), self.tk_finish)
+
+    def tk_finish(self):
+        self.on_finish()
+        self.root.quit()
+
+    def canvas(self):
+        for child in self.root.winfo_children():
+            if isinstance(child, tk.Canvas):
+                return child
+        return None
+
+    def click(self, point):
+        canvas = self.canvas()
+        if canvas is not None:
+            x, y = point
+            canvas.event_generate("<Motion>", x=x, y=y)
+            canvas.event_generate("<ButtonPress-1>", x=x, y=y)
+            canvas.event_generate("<ButtonRelease-1>", x=x, y=y)
+
+    def tk_step(self):
+        canvas = self.canvas()
+        if canvas is not None:
+            self.step_count += 1
+            if self.step_count % TAKEOFF_EVERY == 0:
+                self.click(self.frontend["start"])
+            elif self.step_count % TAKEOFF_EVERY == HOLD_STEP:
+                self.hold_button(canvas)
+            elif self.captures and self.step_count % TAKEOFF_EVERY == 5:
+                canvas.event_generate("<KeyPress-p>")
+            else:
+                key = self.keys[self.step_count % len(self.keys)]
+                canvas.event_generate(f"<KeyPress-{key}>")
+                self.root.after(int(KEY_HOLD * 1000), lambda: canvas.event_generate(f"<KeyRelease-{key}>"))
+        self.root.after(int(COMMAND_INTERVAL * 1000), self.tk_step)
+
+    def hold_button(self, canvas):
+        x, y = self.frontend["move"]
+        canvas.event_generate("<Motion>", x=x, y=y)
+        canvas.event_generate("<ButtonPress-1>", x=x, y=y)
+        # Tracking may drive other axes meanwhile, only the button's own axis is checked
+        axis = next(i for i, a in enumerate(MANUAL_AXES[MOVE_TAG]) if a)
+        held = MANUAL_AXES[MOVE_TAG][axis] * MANUAL_SPEED
+
+        def release():
+            if not any(t.last_rc[axis] == held for t in mock_tello.MockTello.instances):
+                self.failures.append(f"held button had no effect at {self.elapsed():.0f}s")
+            canvas.event_generate("<ButtonRelease-1>", x=x, y=y)
+            self.root.after(int(RELEASE_CHECK * 1000), check_released)
+
+        def check_released():
+            stuck = [t.last_rc for t in mock_tello.MockTello.instances if t.last_rc[axis] != 0]
+            if stuck:
+                self.failures.append(f"rc stuck at {stuck[0]} after button release at {self.elapsed():.0f}s")
+
+        self.root.after(int(KEY_HOLD * 1000), release)
+
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+    # OpenCV front-end: keys are fed through cv2.waitKey
+    def next_key(self):
+        now = time.monotonic() - self.started
+        if now > self.duration:
+            self.on_finish()
+            return ord('q')
+        if self.step_count == 0:
+            self.step_count = 1
+            return ord('t')
+        if now - self.last_step < COMMAND_INTERVAL:
+            return 0xFF
+        self.last_step = now
+        self.step_count += 1
+        if self.captures and self.step_count % TAKEOFF_EVERY == 5:
+            return ord('p')
+        return ord('n')
+
+
+def install(driver, sampler, headless, synthetic):
+    # Front-ends import Tello from djitellopy, hand them the mock instead
+    djitellopy = types.ModuleType("djitellopy")
+    djitellopy.Tello = mock_tello.MockTello
+    sys.modules["djitellopy"] = djitellopy
+
+    if synthetic:
+        create_detector = face_detectors.create_detector
+        face_detectors.create_detector = lambda *args, **kwargs: SyntheticFaceDetector(
+            create_detector(*args, **kwargs))
+
+    def recorded(method):
+        def wrapper(self, *args, **kwargs):
+            frame = method(self, *args, **kwargs)
+            if frame is not None:
+                sampler.record_frame(frame)
+            return frame
+        return wrapper
+
+    frame_source.FrameSource.poll = recorded(frame_source.FrameSource.poll)
+    frame_source.FrameSource.next_frame = recorded(frame_source.FrameSource.next_frame)
+
+    # A frame counts as handled once the front-end puts it on screen
+    item_config = tk.Canvas.itemconfigure
+
+    def recorded_item_config(canvas, tag_or_id, cnf=None, **kw):
+        result = item_config(canvas, tag_or_id, cnf, **kw)
+        if "image" in kw:
+            sampler.record_display()
+        return result
+
+    tk.Canvas.itemconfig = tk.Canvas.itemconfigure = recorded_item_config
+
+    tk_init = tk.Tk.__init__
+
+    def init(root, *args, **kwargs):
+        tk_init(root, *args, **kwargs)
+        driver.attach(root)
+
+    tk.Tk.__init__ = init
+
+    wait_key = cv2.waitKey
+
+    def scripted_wait_key(delay=0):
+        if headless:
+            time.sleep(max(delay, 1) / 1000)
+        else:
+            wait_key(delay)
+        return driver.next_key()
+
+    cv2.waitKey = scripted_wait_key
+    if headless:
+        cv2.imshow = lambda *args: None
+        cv2.destroyAllWindows = lambda *args: None
+    imshow = cv2.imshow
+
+    def recorded_imshow(*args):
+        imshow(*args)
+        sampler.record_display()
+
+    cv2.imshow = recorded_imshow
+
+
+def slope(points):
+    n = len(points)
+    mean_t = sum(t for t, _ in points) / n
+    mean_v = sum(v for _, v in points) / n
+    var = sum((t - mean_t) ** 2 for t, _ in points)
+    if var == 0:
+        return 0.0
+    return sum((t - mean_t) * (v - mean_v) for t, v in points) / var
+
+
+def check_trends(samples, warmup, tolerance, thread_tolerance):
+    """Fit a line to each metric after warm-up, returns a list of failure messages."""
+    samples = [s for s in samples if s["t"] >= warmup]
+    failures = []
+    for key in ("rss_mb", "objects", "threads", "latency_ms", "fps"):
+        points = [(s["t"], s[key]) for s in samples if s[key] is not None]
+        if len(points) < 4:
+            failures.append(f"{key}: only {len(points)} samples after warm-up, run longer")
+            continue
+        growth = slope(points) * (points[-1][0] - points[0][0])
+        baseline = statistics.median(v for _, v in points[:max(len(points) // 4, 1)])
+        if key == "threads":
+            limit = thread_tolerance
+        elif key == "latency_ms":
+            limit = max(baseline * tolerance, LATENCY_FLOOR * 1000)
+        else:
+            limit = baseline * tolerance
+        worsened = -growth if key == "fps" else growth  # A falling frame rate is the failure
+        status = "FAIL" if worsened > limit else "ok"
+        print(f"{key:>10}: baseline {baseline:.1f}, trend {growth:+.1f} over the run, limit {limit:.1f} [{status}]")
+        if worsened > limit:
+            failures.append(f"{key} changed by {growth:+.1f} (limit {limit:.1f})")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("frontend", choices=sorted(FRONTENDS))
+    parser.add_argument("--hours", type=float, default=1.0, help="length of the run")
+    parser.add_argument("--video", help="recorded video to stream instead of the synthetic one")
+    parser.add_argument("--interval", type=float, default=30.0, help="seconds between samples")
+    parser.add_argument("--warmup", type=float, default=120.0, help="seconds ignored by the trend check")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="allowed relative growth over the run")
+    parser.add_argument("--thread-tolerance", type=int, default=2, help="allowed growth in live threads")
+    parser.add_argument("--captures", action="store_true", help="also take snapshots (writes to captures/)")
+    parser.add_argument("--headless", action="store_true", help="skip cv2.imshow for the OpenCV front-end")
+    parser.add_argument("--csv", help="write every sample to this file")
+    args = parser.parse_args()
+
+    frontend = FRONTENDS[args.frontend]
+    duration = args.hours * 3600
+    mock_tello.MockTello.video = args.video
+
+    sampler = Sampler(args.interval)
+    driver = Driver(frontend, duration, args.captures, on_finish=sampler.stop_event.set)
+    install(driver, sampler, args.headless, synthetic=args.video is None)
+
+    print(f"Soak test of {frontend['script']} for {args.hours:g} h")
+    sampler.thread.start()
+    runpy.run_path(frontend["script"], run_name="__main__")
+    sampler.stop_event.set()  # The front-end may also have exited on its own
+
+    if args.csv:
+        with open(args.csv, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(sampler.samples[0]))
+            writer.writeheader()
+            writer.writerows(sampler.samples)
+
+    failures = check_trends(sampler.samples, args.warmup, args.tolerance, args.thread_tolerance)
+    failures += driver.failures
+    if failures:
+        print("Soak test FAILED: " + "; ".join(failures))
+    else:
+        print("Soak test passed")
+    sys.stdout.flush()
+    os._exit(1 if failures else 0)  # Front-end threads are not all daemons, don't wait for them
+
+
+if __name__ == "__main__":
+    main()
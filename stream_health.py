@@ -0,0 +1,168 @@
+import logging
+import threading
+import time
+
+try:
+    import av.logging  # PyAV, djitellopy's decoder
+except ImportError:
+    av = None
+
+STALL_TIMEOUT = 1.0  # Seconds without a new frame before the stream counts as stalled
+STARTUP_TIMEOUT = 5.0  # Seconds allowed for the very first frame after streamon
+MAX_DECODE_ERRORS = 5  # Decode errors since the last good frame that count as a stall
+CHECK_INTERVAL = 0.1  # Seconds between health checks
+RECOVER_TIMEOUT = 2.0  # Seconds to wait for the first frame after a restart, doubled up to STARTUP_TIMEOUT
+BACKOFF_START = 0.5  # First delay between reconnect attempts
+BACKOFF_MAX = 8.0  # Upper bound on the delay between reconnect attempts
+DECODE_LOGGER = "libav"  # PyAV forwards FFmpeg's decoder messages to loggers under this name
+
+
+class DecodeErrorHandler(logging.Handler):
+    """Counts decoder error log records as decode errors on a StreamMonitor."""
+
+    def __init__(self, monitor):
+        super().__init__(logging.ERROR)
+        self.monitor = monitor
+
+    def emit(self, record):
+        self.monitor.report_decode_error()
+
+
+class StreamMonitor:
+    """Watches the video stream and restarts it in the background when it stalls.
+
+    A stall is a frame older than STALL_TIMEOUT, a stopped frame reader or too
+    many decoder errors logged since the last new frame. While the stream is
+    down the rc output is held at zero, and streamoff/streamon is retried with
+    exponential backoff until a new frame arrives. Stall count and
+    time-to-recover are kept per session.
+    """
+
+    def __init__(self, tello, frame_source, rc=None, stall_timeout=STALL_TIMEOUT):
+        self.tello = tello
+        self.frame_source = frame_source
+        self.rc = rc
+        self.stall_timeout = stall_timeout
+        self.lock = threading.Lock()
+        self.down = False
+        self.decode_errors = 0
+        self.checked_seq = 0
+        self.decode_handler = DecodeErrorHandler(self)
+        self.stalls = 0
+        self.recover_times = []
+        self.started_at = time.monotonic()
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def start(self):
+        if self.thread is not None and self.thread.is_alive():
+            return
+        self.stop_event.clear()
+        self.started_at = time.monotonic()
+        if av is not None:
+            av.logging.set_level(av.logging.ERROR)  # Newer PyAV only forwards FFmpeg logs once a level is set
+        logging.getLogger(DECODE_LOGGER).addHandler(self.decode_handler)
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        logging.getLogger(DECODE_LOGGER).removeHandler(self.decode_handler)
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join(timeout=1.0)
+        self.thread = None
+
+    def report_decode_error(self):
+        with self.lock:
+            self.decode_errors += 1
+
+    def is_down(self):
+        with self.lock:
+            return self.down
+
+    def stalled(self):
+        age = self.frame_source.frame_age()
+        if age is None:  # No frame yet, give the decoder time to start up
+            if time.monotonic() - self.started_at > STARTUP_TIMEOUT:
+                return True
+        elif age > self.stall_timeout:
+            return True
+        if getattr(self.frame_source.frame_read, "stopped", False):
+            return True
+        with self.lock:
+            if self.frame_source.seq != self.checked_seq:  # A good frame since the last check
+                self.checked_seq = self.frame_source.seq
+                self.decode_errors = 0
+            return self.decode_errors >= MAX_DECODE_ERRORS
+
+    def run(self):
+        while not self.stop_event.wait(CHECK_INTERVAL):
+            if self.stalled():
+                self.recover()
+
+    def recover(self):
+        stalled_at = time.monotonic()
+        last_seq = self.frame_source.seq
+        with self.lock:
+            self.down = True
+            self.stalls += 1
+        self.zero_rc(True)
+        print(f"Video stream stalled (stall #{self.stalls}), reconnecting...")
+
+        delay = BACKOFF_START
+        timeout = RECOVER_TIMEOUT
+        while True:
+            if self.stop_event.is_set():
+                return
+            try:
+                self.restart_stream()
+                last_seq = self.frame_source.seq  # Only a frame from the new reader counts
+            except Exception as e:
+                print(f"Exception while restarting video stream: {e}")
+            # Keep waiting through the backoff, a slow decoder may still deliver its first frame
+            if self.frame_source.next_frame(last_seq, timeout=timeout + delay) is not None:
+                break
+            delay = min(delay * 2, BACKOFF_MAX)
+            timeout = min(timeout * 2, STARTUP_TIMEOUT)
+
+        recover_time = time.monotonic() - stalled_at
+        with self.lock:
+            self.down = False
+            self.decode_errors = 0
+            self.recover_times.append(recover_time)
+        self.zero_rc(False)
+        print(f"Video stream recovered in {recover_time:.2f}s")
+
+    def restart_stream(self):
+        # Drop the old reader so get_frame_read() opens a fresh decoder
+        frame_read = getattr(self.tello, "background_frame_read", None)
+        if frame_read is not None:
+            frame_read.stop()
+            self.tello.background_frame_read = None
+        self.tello.streamoff()
+        self.tello.streamon()
+        self.frame_source.set_reader(self.tello.get_frame_read())
+
+    def zero_rc(self, down):
+        if self.rc is not None:
+            self.rc.inhibit(down)
+        elif down:
+            self.tello.send_rc_control(0, 0, 0, 0)
+
+    def stats(self):
+        with self.lock:
+            recover_times = list(self.recover_times)
+            stalls = self.stalls
+        return {
+            "session_time": time.monotonic() - self.started_at,
+            "stalls": stalls,
+            "recovered": len(recover_times),
+            "mean_recover_time": sum(recover_times) / len(recover_times) if recover_times else 0.0,
+            "max_recover_time": max(recover_times, default=0.0),
+        }
+
+    def report(self):
+        s = self.stats()
+        return (f"Stream health: {s['stalls']} stalls in {s['session_time']:.0f}s, "
+                f"{s['recovered']} recovered, mean recover {s['mean_recover_time']:.2f}s, "
+                f"max {s['max_recover_time']:.2f}s")
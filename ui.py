@@ -3,11 +3,13 @@ from djitellopy import Tello
 import cv2
 import tkinter as tk
 from PIL import Image, ImageTk
+from rc_control import RcController, MANUAL_AXES, MANUAL_KEYS, KEY_HOLD_TIMEOUT
+from frame_source import FrameSource
+from stream_health import StreamMonitor
+from capture import FrameCapture
 
 width = 320
 height = 240
-move_distance = 20
-rotate_degree = 15
 
 class TelloApp:
     def __init__(self, window, window_title):
@@ -24,10 +26,26 @@ class TelloApp:
         self.me.streamoff()
         self.me.streamon()
 
+        self.rc = RcController(self.me)
+        self.rc.start()
+
+        self.frames = FrameSource(self.me.get_frame_read())
+        self.frames.start()
+        self.last_seq = 0
+
+        self.monitor = StreamMonitor(self.me, self.frames, self.rc)
+        self.monitor.start()
+
+        self.capture = FrameCapture()
+
+        # Created once and swapped per frame, deleting canvas items under a held
+        # button would lose its <ButtonRelease-1>
+        self.image_id = self.video_canvas.create_image(0, 0, anchor=tk.NW)
+        self.draw_buttons()
+
         self.low_battery = False
         self.update_battery()
         self.update_video()
-        self.draw_buttons()
 
         self.window.mainloop()
 
@@ -35,14 +53,21 @@ class TelloApp:
         self.video_canvas.tag_bind("start_btn", "<Button-1>", self.start_drone)
         self.video_canvas.tag_bind("land_btn", "<Button-1>", self.land_drone)
         self.video_canvas.tag_bind("exit_btn", "<Button-1>", self.exit_app)
-        self.video_canvas.tag_bind("left_btn", "<Button-1>", self.go_left)
-        self.video_canvas.tag_bind("right_btn", "<Button-1>", self.go_right)
-        self.video_canvas.tag_bind("up_btn", "<Button-1>", self.go_up)
-        self.video_canvas.tag_bind("down_btn", "<Button-1>", self.go_down)
-        self.video_canvas.tag_bind("yaw_left_btn", "<Button-1>", self.yaw_left)
-        self.video_canvas.tag_bind("yaw_right_btn", "<Button-1>", self.yaw_right)
-        self.video_canvas.tag_bind("tilt_forward_btn", "<Button-1>", self.tilt_forward)
-        self.video_canvas.tag_bind("tilt_backward_btn", "<Button-1>", self.tilt_backward)
+        self.video_canvas.tag_bind("snapshot_btn", "<Button-1>", self.take_snapshot)
+        self.video_canvas.tag_bind("burst_btn", "<Button-1>", self.start_burst)
+        self.window.bind("<KeyPress-p>", self.take_snapshot)
+        self.window.bind("<KeyPress-b>", self.start_burst)
+
+        for tag in MANUAL_AXES:
+            self.video_canvas.tag_bind(tag, "<ButtonPress-1>", lambda event, tag=tag: self.manual_press(tag))
+            self.video_canvas.tag_bind(tag, "<ButtonRelease-1>", lambda event, tag=tag: self.manual_release(tag))
+
+        for key, tag in MANUAL_KEYS.items():
+            self.window.bind(f"<KeyPress-{key}>", lambda event, tag=tag: self.manual_press(tag, KEY_HOLD_TIMEOUT))
+            self.window.bind(f"<KeyRelease-{key}>", lambda event, tag=tag: self.manual_release(tag))
+
+        # A release that goes to another window never arrives, drop everything held
+        self.window.bind("<FocusOut>", lambda event: self.rc.release_all())
 
     def draw_buttons(self):
         self.video_canvas.create_rectangle(10, 10, 60, 40, fill="green", tags="start_btn")
@@ -61,11 +86,13 @@ class TelloApp:
             (250, 10, 300, 40, "purple", "yaw_right_btn", "YawR"),
             (220, 40, 270, 70, "purple", "tilt_forward_btn", "TiltF"),
             (220, 80, 270, 110, "purple", "tilt_backward_btn", "TiltB"),
+            (160, 45, 210, 70, "orange", "snapshot_btn", "Snap"),
+            (160, 80, 210, 110, "orange", "burst_btn", "Burst"),
         ]
 
         for x1, y1, x2, y2, color, tag, text in movement_buttons:
             self.video_canvas.create_rectangle(x1, y1, x2, y2, fill=color, tags=tag)
-            self.video_canvas.create_text((x1+x2)//2, (y1+y2)//2, text=text)
+            self.video_canvas.create_text((x1+x2)//2, (y1+y2)//2, text=text, tags=tag)  # Label is part of the button
 
     def threaded_drone_command(self, func):
         threading.Thread(target=func).start()
@@ -74,44 +101,33 @@ class TelloApp:
         self.threaded_drone_command(self.me.takeoff)
 
     def land_drone(self, event=None):
+        self.rc.release_all()
         self.threaded_drone_command(self.me.land)
         self.low_battery = True
 
     def exit_app(self, event=None):
+        self.rc.stop()
+        self.monitor.stop()
+        self.frames.stop()
+        self.capture.close()
+        print(self.monitor.report())
         self.threaded_drone_command(self.me.streamoff)
         self.window.quit()
 
-    def go_left(self, event=None):
-        if not self.low_battery:
-            self.threaded_drone_command(lambda: self.me.move_left(move_distance))
+    def take_snapshot(self, event=None):
+        frame = self.frames.poll()
+        if frame is not None:
+            self.capture.snapshot(frame.image, frame.seq)
 
-    def go_right(self, event=None):
-        if not self.low_battery:
-            self.threaded_drone_command(lambda: self.me.move_right(move_distance))
-
-    def go_up(self, event=None):
-        if not self.low_battery:
-            self.threaded_drone_command(lambda: self.me.move_up(move_distance))
-
-    def go_down(self, event=None):
-        if not self.low_battery:
-            self.threaded_drone_command(lambda: self.me.move_down(move_distance))
+    def start_burst(self, event=None):
+        self.capture.start_burst()
 
-    def yaw_left(self, event=None):
+    def manual_press(self, tag, timeout=None):
         if not self.low_battery:
-            self.threaded_drone_command(lambda: self.me.rotate_counter_clockwise(rotate_degree))
+            self.rc.press(tag, timeout=timeout)
 
-    def yaw_right(self, event=None):
-        if not self.low_battery:
-            self.threaded_drone_command(lambda: self.me.rotate_clockwise(rotate_degree))
-
-    def tilt_forward(self, event=None):
-        if not self.low_battery:
-            self.threaded_drone_command(lambda: self.me.move_forward(move_distance))
-
-    def tilt_backward(self, event=None):
-        if not self.low_battery:
-            self.threaded_drone_command(lambda: self.me.move_backward(move_distance))
+    def manual_release(self, tag):
+        self.rc.release(tag)
 
     def update_battery(self):
         self.battery_percentage = self.me.get_battery()
@@ -126,17 +142,21 @@ class TelloApp:
         if self.low_battery:
             return
 
-        frame_read = self.me.get_frame_read()
-        if frame_read is not None and frame_read.frame is not None:
-            my_frame = frame_read.frame
-            img = cv2.resize(my_frame, (width, height))
+        frame = self.frames.poll(self.last_seq)
+        if frame is not None:
+            self.last_seq = frame.seq
+            self.capture.offer(frame.image, frame.seq)
+            img = cv2.resize(frame.image, (width, height))
             img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
             image = Image.fromarray(img)
             self.photo = ImageTk.PhotoImage(image=image)
             
-            self.video_canvas.delete("all")
-            self.video_canvas.create_image(0, 0, anchor=tk.NW, image=self.photo)
-            self.draw_buttons()
+            self.video_canvas.itemconfig(self.image_id, image=self.photo)
+            self.video_canvas.delete("stream_status")
+        elif self.monitor.is_down():
+            # Don't leave the last frame up as if it were live
+            self.video_canvas.delete("stream_status")
+            self.video_canvas.create_text(width // 2, height - 15, text="Video lost, reconnecting...", fill="red", tags="stream_status")
 
         self.window.after(50, self.update_video)
 